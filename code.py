@@ -1,174 +1,301 @@
 import streamlit as st
-import sys
-import subprocess
-from importlib.metadata import version, PackageNotFoundError
-
-# Dependency check function
-def check_dependencies():
-    required = {
-        'biopython': '1.81',
-        'streamlit': '1.32.0',
-        'pyvis': '0.3.1',
-        'plotly': '5.18.0',
-        'pandas': '2.1.4',
-        'matplotlib': '3.10.0',
-        'seaborn': '0.13.0',
-        'streamlit-lottie': '0.0.5',
-        'requests': '2.31.0'
-    }
-    missing = []
-    for package, req_version in required.items():
-        try:
-            installed = version(package)
-            if installed < req_version:
-                missing.append(f"{package}>={req_version} (installed: {installed})")
-        except PackageNotFoundError:
-            missing.append(f"{package}>={req_version}")
-    if missing:
-        st.error("Missing or outdated dependencies detected!")
-        st.code("pip install --upgrade " + " ".join(missing))
-        st.stop()
-
-check_dependencies()
-
-from Bio import Phylo
-from io import StringIO
 import streamlit.components.v1 as components
-import random
-import matplotlib.pyplot as plt
-import pandas as pd
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-import base64
-from streamlit_lottie import st_lottie
-import requests
-
-# Pyvis Network Import
-try:
-    import pyvis
-    from pyvis.network import Network
-    PYVIS_AVAILABLE = True
-except (ImportError, AttributeError) as e:
-    st.warning(f"Pyvis visualization unavailable: {str(e)}. Using alternative methods.")
-    PYVIS_AVAILABLE = False
-    Network = None
+import importlib.util
+import numpy as np
+import hashlib
+import functools
+
+# Plotting, pandas, Biopython, HTTP and Lottie libraries, and the numba kernels, are imported
+# inside the functions that use them, so a rerun only pays for what the active page needs.
+
+# Pyvis availability is probed without importing it
+PYVIS_AVAILABLE = importlib.util.find_spec("pyvis") is not None
+if not PYVIS_AVAILABLE:
+    st.warning("Pyvis visualization unavailable: pyvis is not installed. Using alternative methods.")
+
+# One pooled HTTP session per server process; a module-level session would be rebuilt on every rerun
+@st.cache_resource(show_spinner=False)
+def http_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    return session
+
+# Failures raise instead of returning None: st.cache_data doesn't cache exceptions,
+# so one slow or failed fetch is retried on the next rerun instead of sticking for a day
+@st.cache_data(ttl=24*60*60, show_spinner=False)
+def _fetch_lottie(url):
+    r = http_session().get(url, timeout=3.0)
+    r.raise_for_status()
+    return r.json()
 
 def load_lottie_url(url):
+    import requests
     try:
-        r = requests.get(url)
-        if r.status_code != 200:
-            return None
-        return r.json()
-    except:
+        return _fetch_lottie(url)
+    except requests.RequestException:
+        # Also covers non-2xx responses (HTTPError) and invalid JSON (requests.JSONDecodeError)
         return None
 
 def download_button(content, filename, label):
-    b64 = base64.b64encode(content.encode()).decode()
-    custom_css = """
-    <style>
-    .custom-download-button a {
-        display: inline-block;
-        font-size: 16px;
-        font-weight: bold;
-        color: white;
-        background-color: #1f77b4;
-        padding: 10px 20px;
-        text-decoration: none;
-        border-radius: 8px;
-        transition: background-color 0.3s ease;
-    }
-    .custom-download-button a:hover {
-        background-color: #145a86;
-    }
-    </style>
-    """
-    href = f'<div class="custom-download-button">{custom_css}<a href="data:file/txt;base64,{b64}" download="{filename}">{label}</a></div>'
-    st.markdown(href, unsafe_allow_html=True)
+    st.download_button(label=label, data=content, file_name=filename, mime="text/plain")
+
+# -------------------------------
+# Newick Parsing
+# -------------------------------
+# Cached across reruns; the decoded arrays are small next to the clade objects Phylo.read would build
+@st.cache_data(show_spinner=False)
+def parse_newick(newick_str):
+    from kernels import decode_newick
+    raw = newick_str.encode()
+    num_nodes, parents, node_depth, label_span, length_span = decode_newick(np.frombuffer(raw, dtype=np.uint8))
+    children = [[] for _ in range(num_nodes)]
+    for child in range(1, num_nodes):
+        children[parents[child]].append(child)
+    names = []
+    for i, (start, end) in enumerate(label_span):
+        label = raw[start:end].decode()
+        # As in Bio.Phylo, a numeric label after ')' is a support value, not a name
+        if children[i] and _is_number(label):
+            label = ""
+        # Unnamed clades are labelled by preorder index, which is stable between runs
+        names.append(label or f"N{i}")
+    # Missing branch lengths count as 0
+    lengths = np.array([float(raw[start:end].strip() or 0) for start, end in length_span])
+    return names, children, parents, node_depth, lengths
+
+def _is_number(label):
+    try:
+        float(label)
+    except ValueError:
+        return False
+    return True
+
+def flatten_tree(tree):
+    # Same preorder arrays as parse_newick, read straight from an in-memory Bio.Phylo tree
+    names, children, parents, node_depth, lengths = [], [], [], [], []
+    stack = [(tree.root, -1, 0)]
+    while stack:
+        clade, parent, depth = stack.pop()
+        node = len(names)
+        names.append(clade.name or f"N{node}")
+        children.append([])
+        parents.append(parent)
+        node_depth.append(depth)
+        lengths.append(clade.branch_length or 0.0)
+        if parent >= 0:
+            children[parent].append(node)
+        stack.extend((child, node, depth + 1) for child in reversed(clade.clades))
+    return names, children, np.array(parents), np.array(node_depth), np.array(lengths, dtype=float)
+
+def layout_tree(children, node_depth):
+    # Leaves take consecutive x slots in DFS order and each internal node sits midway
+    # over its first and last child; y is the depth from the root.
+    x = np.zeros(len(children))
+    leaf_slot = 0
+    for node in range(len(children)):
+        if not children[node]:
+            x[node] = leaf_slot
+            leaf_slot += 1
+    # Preorder numbering puts children after their parent, so walk backwards
+    for node in range(len(children) - 1, -1, -1):
+        if children[node]:
+            x[node] = (x[children[node][0]] + x[children[node][-1]]) / 2
+    return x, node_depth.astype(float)
+
+def radial_layout(children, node_depth):
+    # Leaves are spread evenly around the circle in DFS order, each internal node takes the
+    # mean angle of its children, and the radius is the depth from the root.
+    theta = np.zeros(len(children))
+    is_leaf = np.array([not kids for kids in children])
+    theta[is_leaf] = 2 * np.pi * np.arange(is_leaf.sum()) / max(is_leaf.sum(), 1)
+    for node in range(len(children) - 1, -1, -1):
+        if children[node]:
+            theta[node] = theta[children[node]].mean()
+    r = node_depth.astype(float)
+    return r * np.cos(theta), r * np.sin(theta)
+
+def phylogram_layout(children, parents, node_depth, lengths):
+    # Classic left-to-right phylogram: x is the summed branch length from the root and
+    # y the leaf slot, with internal nodes centred over their children.
+    leaf_slots, _ = layout_tree(children, node_depth)
+    x = np.zeros(len(children))
+    for node in range(1, len(children)):
+        x[node] = x[parents[node]] + lengths[node]
+    return x, leaf_slots
+
+TREE_LAYOUTS = ["Rectangular", "Radial", "Phylogram"]
+
+def tree_coordinates(children, parents, node_depth, lengths, layout):
+    if layout == "Radial":
+        return radial_layout(children, node_depth)
+    if layout == "Phylogram":
+        return phylogram_layout(children, parents, node_depth, lengths)
+    return layout_tree(children, node_depth)
+
+def tree_geometry(names, children, parents, node_depth, lengths, layout):
+    # Everything the renderers need: the labels plus flat arrays the cached builders hash cheaply,
+    # an (E, 2) int32 table of (parent, child) indices and the x / y coordinates.
+    x, y = tree_coordinates(children, parents, node_depth, lengths, layout)
+    edges = np.column_stack([parents[1:], np.arange(1, len(names))]).astype(np.int32)
+    return tuple(names), edges, x, y
+
+# lru_cache shares the result between the Pyvis and Plotly paths within a run without
+# Streamlit hashing the output; the st.cache_data builders below persist across reruns.
+@functools.lru_cache(maxsize=32)
+def _parse_and_layout(newick_str, layout):
+    return tree_geometry(*parse_newick(newick_str), layout)
+
+def decode_tree(tree_or_str, layout):
+    # Newick strings go through the byte-level parser; Bio.Phylo trees are used as they are
+    if isinstance(tree_or_str, str):
+        return _parse_and_layout(tree_or_str, layout)
+    return tree_geometry(*flatten_tree(tree_or_str), layout)
 
 # -------------------------------
 # Visualization 
 # -------------------------------
-def visualize_with_plotly(newick_str):
-    st.write("### 🌳 Tree Visualization (Plotly)")
-    tree = Phylo.read(StringIO(newick_str), "newick")
-    edges = []
-    node_names = set()
-    for clade in tree.find_clades():
-        node_name = clade.name if clade.name else f"Node_{id(clade)}"
-        node_names.add(node_name)
-        for child in clade:
-            child_name = child.name if child.name else f"Node_{id(child)}"
-            edges.append((node_name, child_name))
-            node_names.add(child_name)
+@st.cache_data(show_spinner=False)
+def _build_plotly_fig(names, edges, node_x, node_y, layout="Rectangular"):
+    import plotly.graph_objects as go
+
+    # One trace for all edges and one for all nodes. Each edge contributes
+    # (parent, child, NaN); the NaN breaks the line between segments.
+    parent_x, parent_y = node_x[edges[:, 0]], node_y[edges[:, 0]]
+    child_x, child_y = node_x[edges[:, 1]], node_y[edges[:, 1]]
+    gap = np.full(len(edges), np.nan)
+    if layout == "Phylogram":
+        # Right-angle elbows: down the parent's vertical line, then across to the child
+        edge_x = np.column_stack([parent_x, parent_x, child_x, gap]).ravel()
+        edge_y = np.column_stack([parent_y, child_y, child_y, gap]).ravel()
+    else:
+        edge_x = np.column_stack([parent_x, child_x, gap]).ravel()
+        edge_y = np.column_stack([parent_y, child_y, gap]).ravel()
+
     fig = go.Figure()
-    node_positions = {name: (random.random(), random.random()) for name in node_names}
-    for edge in edges:
-        fig.add_trace(go.Scatter(
-            x=[node_positions[edge[0]][0], node_positions[edge[1]][0]],
-            y=[node_positions[edge[0]][1], node_positions[edge[1]][1]],
-            mode='lines',
-            line=dict(width=2, color='gray'),
-            hoverinfo='none'
-        ))
-    for name in node_names:
-        x, y = node_positions[name]
-        fig.add_trace(go.Scatter(
-            x=[x], y=[y],
-            mode='markers+text',
-            marker=dict(size=20, color='blue'),
-            text=name,
-            textposition="top center",
-            name=name
-        ))
+    fig.add_trace(go.Scattergl(
+        x=edge_x, y=edge_y,
+        mode='lines',
+        line=dict(width=2, color='gray'),
+        hoverinfo='none'
+    ))
+    fig.add_trace(go.Scattergl(
+        x=node_x, y=node_y,
+        mode='markers+text',
+        marker=dict(size=20, color='blue'),
+        text=names,
+        textposition="top center",
+        hoverinfo='text'
+    ))
     fig.update_layout(
         showlegend=False,
         xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
         yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
         height=600,
-        margin=dict(l=20, r=20, b=20, t=40)
+        margin=dict(l=20, r=20, b=20, t=40),
+        # Zoom/pan survive reruns until the layout itself changes
+        uirevision=layout
     )
-    st.plotly_chart(fig, use_container_width=True)
+    if layout == "Radial":
+        # Keep the circle round
+        fig.update_yaxes(scaleanchor="x", scaleratio=1)
+    else:
+        # Root at the top (rectangular) or first leaf at the top (phylogram)
+        fig.update_yaxes(autorange="reversed")
+    return fig
+
+def _show_plotly_tree(tree, layout):
+    st.write("### 🌳 Tree Visualization (Plotly)")
+    st.plotly_chart(_build_plotly_fig(*tree, layout=layout), theme=None, use_container_width=True)
+
+def visualize_with_plotly(tree_or_str, layout="Rectangular"):
+    _show_plotly_tree(decode_tree(tree_or_str, layout), layout)
 
 # -------------------------------
 # Visualization with Pyvis  
 # -------------------------------
-def visualize_phylo_tree(newick_str):
-    if PYVIS_AVAILABLE:
+_PYVIS_OPTIONS = """
+var options = {
+  "nodes": {"font": {"size": 20}},
+  "edges": {"smooth": false},
+  "physics": {"enabled": false},
+  "interaction": {"hover": true, "tooltipDelay": 100}
+}
+"""
+
+# Pixels per layout unit: rectangular is (per leaf slot, per level), radial is per level on both
+# axes, and the phylogram's x axis (branch length) is fitted to the canvas width
+PYVIS_SCALE = {"Rectangular": (120, 100), "Radial": (150, 150), "Phylogram": (None, 60)}
+
+# vis.js slows to a crawl on large graphs; bigger trees go straight to the WebGL Plotly view
+PYVIS_MAX_NODES = 500
+
+# The scale is passed in rather than read from PYVIS_SCALE, so it is part of
+# st.cache_data's key and editing it can't serve stale HTML
+@st.cache_data(show_spinner=False)
+def _build_pyvis_html(names, edges, node_x, node_y, scale):
+    from pyvis.network import Network
+    x_scale, y_scale = scale
+    if x_scale is None:
+        # Branch lengths have arbitrary units; stretch the deepest node to 800 px
+        x_scale = 800 / (node_x.max() or 1)
+    # The HTML is rendered from memory, so vis.js has to come from the CDN
+    net = Network(height="600px", width="100%", bgcolor="#f4faff", font_color="black", cdn_resources="remote")
+    # Nodes are keyed by their preorder index, so repeated labels stay separate nodes.
+    # Fixed coordinates, scaled from layout units to pixels.
+    n = len(names)
+    net.add_nodes(
+        list(range(n)),
+        label=list(names),
+        shape=["ellipse"] * n,
+        color=["#2980b9"] * n,
+        x=(node_x * x_scale).tolist(),
+        y=(node_y * y_scale).tolist()
+    )
+    # Network.add_edge scans every existing edge for duplicates (quadratic overall);
+    # tree edges are unique by construction, so they are assigned in one go.
+    net.edges = [{"from": parent, "to": child} for parent, child in edges.tolist()]
+    net.set_options(_PYVIS_OPTIONS)
+    return net.generate_html(notebook=False)
+
+def visualize_phylo_tree(tree_or_str, layout="Rectangular"):
+    tree = decode_tree(tree_or_str, layout)
+    n_nodes = len(tree[0])
+    if PYVIS_AVAILABLE and n_nodes <= PYVIS_MAX_NODES:
         try:
-            tree = Phylo.read(StringIO(newick_str), "newick")
-            net = Network(height="600px", width="100%", bgcolor="#f4faff", font_color="black")
-            net.barnes_hut()
-            for clade in tree.find_clades():
-                node_name = clade.name if clade.name else f"Node_{id(clade)}"
-                net.add_node(node_name, label=node_name, shape="ellipse", color="#2980b9")
-            for clade in tree.find_clades():
-                for child in clade:
-                    parent_name = clade.name if clade.name else f"Node_{id(clade)}"
-                    child_name = child.name if child.name else f"Node_{id(child)}"
-                    net.add_edge(parent_name, child_name)
-            net.set_options("""
-            var options = {
-              "nodes": {"font": {"size": 20}},
-              "edges": {"smooth": false},
-              "physics": {"barnesHut": {"gravitationalConstant": -8000, "springLength": 100}},
-              "interaction": {"hover": true, "tooltipDelay": 100}
-            }
-            """)
-            net.save_graph("phylogenetic_tree.html")
-            with open("phylogenetic_tree.html", 'r', encoding='utf-8') as f:
-                html_content = f.read()
-                components.html(html_content, height=600)
+            components.html(_build_pyvis_html(*tree, scale=PYVIS_SCALE[layout]), height=600)
         except Exception as e:
             st.warning(f"Pyvis visualization failed: {str(e)}. Falling back to Plotly.")
-            visualize_with_plotly(newick_str)
+            _show_plotly_tree(tree, layout)
     else:
-        visualize_with_plotly(newick_str)
+        if PYVIS_AVAILABLE:
+            st.caption(f"Using WebGL renderer for {n_nodes} nodes")
+        _show_plotly_tree(tree, layout)
 
 # -------------------------------
 # Home Page 
 # -------------------------------
+# Static page text lives at module scope instead of being rebuilt on every rerun
+_HOME_AUTHOR_MD = "**Shivani Sujit Navandar**  \n[LinkedIn Profile](https://www.linkedin.com/in/shivani-navandar-3b8450291)  \n🎓 M.Sc. Bioinformatics, DES Pune University  \n🔬 Functional genomics & computational biology  \n💻 Python, R, and bioinformatics tools"
+_HOME_MENTOR_MD = "**Dr. Kushagra Kashyap**  \n[LinkedIn](https://www.linkedin.com/in/dr-kushagra-kashyap-b230a3bb/)  \nAssistant Professor, DES Pune University"
+
+_HOME_ABOUT_HTML = """
+<div style='background-color:#ecfaff;padding:15px;border-radius:10px;line-height:1.7; color:black;'>
+    <p>This web server is designed to empower researchers, educators, and students in exploring evolutionary biology through intuitive tools.</p>
+    <ul style="list-style-type: '🧬 '; font-size: 17px; padding-left: 20px;">
+        <li>Upload raw FASTA sequences and automatically construct phylogenetic trees</li>
+        <li>Simulate species divergence and explore genetic distances visually</li>
+        <li>Download tree files in Newick format for publication or further analysis</li>
+        <li>Enjoy beautiful data visualizations powered by Plotly and Pyvis</li>
+        <li>Experience modern, responsive design with Lottie animations</li>
+    </ul>
+</div>
+"""
+
+@st.fragment
 def show_home():
+    from streamlit_lottie import st_lottie
     st.title("👩‍🔬 Welcome to the Phylogenetic Tool")
 
     lottie_animation = load_lottie_url("https://assets1.lottiefiles.com/packages/lf20_tno6cg2w.json")
@@ -179,26 +306,15 @@ def show_home():
 
     st.header("📌 Author")
     st.image("https://media.licdn.com/dms/image/v2/D4D03AQEgnt4XvXhF4w/profile-displayphoto-shrink_800_800/B4DZawFXQhG8Ac-/0/1746710919292?e=1752105600&v=beta&t=6XpldOaEle1lITOL3VLe_t7_NjlwkKQtrjqFnuadKh4", width=150)
-    st.markdown("**Shivani Sujit Navandar**  \n[LinkedIn Profile](https://www.linkedin.com/in/shivani-navandar-3b8450291)  \n🎓 M.Sc. Bioinformatics, DES Pune University  \n🔬 Functional genomics & computational biology  \n💻 Python, R, and bioinformatics tools")
+    st.markdown(_HOME_AUTHOR_MD)
 
     st.header("🌐 About This Web Server")
-    st.markdown("""
-    <div style='background-color:#ecfaff;padding:15px;border-radius:10px;line-height:1.7; color:black;'>
-        <p>This web server is designed to empower researchers, educators, and students in exploring evolutionary biology through intuitive tools.</p>
-        <ul style="list-style-type: '🧬 '; font-size: 17px; padding-left: 20px;">
-            <li>Upload raw FASTA sequences and automatically construct phylogenetic trees</li>
-            <li>Simulate species divergence and explore genetic distances visually</li>
-            <li>Download tree files in Newick format for publication or further analysis</li>
-            <li>Enjoy beautiful data visualizations powered by Plotly and Pyvis</li>
-            <li>Experience modern, responsive design with Lottie animations</li>
-        </ul>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_HOME_ABOUT_HTML, unsafe_allow_html=True)
 
 
     st.header("👨‍🏫 Mentor")
     st.image("https://media.licdn.com/dms/image/v2/D5603AQF9gsU7YBjWVg/profile-displayphoto-shrink_800_800/B56ZZI.WrdH0Ac-/0/1744981029051?e=1752105600&v=beta&t=NY99PWbYHr9Wi8VkPoMtFBfLhqvNl1uLKgH1_hetXY0", width=150)
-    st.markdown("**Dr. Kushagra Kashyap**  \n[LinkedIn](https://www.linkedin.com/in/dr-kushagra-kashyap-b230a3bb/)  \nAssistant Professor, DES Pune University")
+    st.markdown(_HOME_MENTOR_MD)
 
     st.header("📬 Feedback")
     st.markdown("Email: 3522411011@despu.edu.in")
@@ -207,44 +323,137 @@ def show_home():
 # -------------------------------
 # FASTA Upload Page
 # -------------------------------
-from Bio import SeqIO
-from Bio.Align import PairwiseAligner
-from Bio.Phylo.TreeConstruction import DistanceMatrix, DistanceTreeConstructor
-from io import StringIO
-
+from io import StringIO, TextIOWrapper
+
+DISTANCE_METHODS = ["Fast (identity / k-mer)", "Pairwise alignment (slow)"]
+
+def encode_sequences(records):
+    # Pack sequences into one (N, L) uint8 array, padding shorter ones with a 0 sentinel
+    seqs = [np.frombuffer(str(rec.seq).upper().encode('ascii'), dtype=np.uint8) for rec in records]
+    lengths = np.array([len(seq) for seq in seqs])
+    encoded = np.zeros((len(seqs), lengths.max()), dtype=np.uint8)
+    for i, seq in enumerate(seqs):
+        encoded[i, :len(seq)] = seq
+    return encoded, lengths
+
+# Upper bound (bytes) for the boolean comparison block built in identity_distance_matrix
+IDENTITY_BLOCK_BYTES = 32 * 1024 * 1024
+
+def identity_distance_matrix(encoded):
+    # Equal-length sequences: fraction of mismatching positions (p-distance).
+    n, length = encoded.shape
+    # The parallel kernel costs a JIT compile on first use, so small inputs stay on NumPy
+    if n * n * length > IDENTITY_BLOCK_BYTES:
+        from kernels import NUMBA_AVAILABLE, pairwise_identity
+        if NUMBA_AVAILABLE:
+            return 1 - pairwise_identity(encoded)
+    # Compare blocks of rows so the (rows, N, L) temporary stays within IDENTITY_BLOCK_BYTES
+    block = max(1, IDENTITY_BLOCK_BYTES // (n * length))
+    matches = np.empty((n, n), dtype=np.int64)
+    for start in range(0, n, block):
+        rows = encoded[start:start + block]
+        matches[start:start + block] = (rows[:, None, :] == encoded[None, :, :]).sum(-1)
+    return 1 - matches / length
+
+# 2-bit codes for A, C, G, T/U; every other byte (N, gaps, padding, amino acids) is 255
+_NUCLEOTIDE_CODES = np.full(256, 255, dtype=np.uint8)
+_NUCLEOTIDE_CODES[np.frombuffer(b"ACGTU", dtype=np.uint8)] = [0, 1, 2, 3, 3]
+
+def nucleotide_kmers(encoded, lengths, k=11):
+    # Sorted set of 2-bit packed k-mers per sequence; windows touching a non-ACGT byte are dropped.
+    # k <= 31 keeps every k-mer within an int64.
+    kmer_sets = []
+    for seq, length in zip(encoded, lengths):
+        codes = _NUCLEOTIDE_CODES[seq[:length]]
+        windows = max(len(codes) - k + 1, 0)
+        packed = np.zeros(windows, dtype=np.int64)
+        for offset in range(k):
+            packed = (packed << 2) | (codes[offset:offset + windows] & 3)
+        invalid = np.concatenate([[0], np.cumsum(codes == 255)])
+        clean = invalid[k:k + windows] == invalid[:windows]
+        kmer_sets.append(np.unique(packed[clean]))
+    return kmer_sets
+
+def kmer_distance_matrix(kmer_sets, k=11):
+    # Unequal-length sequences: Mash distance, which turns the Jaccard index j of two k-mer sets
+    # into an estimate of per-base divergence, -ln(2j / (1 + j)) / k, capped at 1
+    n = len(kmer_sets)
+    matrix = np.zeros((n, n))
+    for i in range(n):
+        for j in range(i):
+            shared = len(np.intersect1d(kmer_sets[i], kmer_sets[j], assume_unique=True))
+            jaccard = shared / (len(kmer_sets[i]) + len(kmer_sets[j]) - shared)
+            distance = -np.log(2 * jaccard / (1 + jaccard)) / k if jaccard > 0 else 1.0
+            matrix[i, j] = matrix[j, i] = min(distance, 1.0)
+    return matrix
+
+def alignment_distance_matrix(records):
+    from Bio.Align import PairwiseAligner
+    # Global alignment score for every pair (Biopython). Scored serially: PairwiseAligner.score
+    # holds the GIL, so worker threads would not overlap.
+    aligner = PairwiseAligner()
+    aligner.mode = 'global'
+    n = len(records)
+    matrix = np.zeros((n, n))
+    for i in range(n):
+        for j in range(i):
+            score = aligner.score(records[i].seq, records[j].seq)
+            max_len = max(len(records[i]), len(records[j]))
+            matrix[i, j] = matrix[j, i] = 1 - (score / max_len)
+    return matrix
+
+# Keyed on a digest of the upload so Streamlit doesn't hash every sequence on each rerun
+@st.cache_data(show_spinner=False)
+def fasta_distance_matrix(fasta_digest, method, _records):
+    if method == DISTANCE_METHODS[1]:
+        return alignment_distance_matrix(_records)
+    encoded, lengths = encode_sequences(_records)
+    if (lengths == lengths[0]).all():
+        return identity_distance_matrix(encoded)
+    kmer_sets = nucleotide_kmers(encoded, lengths)
+    # Sequences shorter than k or not DNA/RNA have no k-mers to compare; align those instead
+    if any(len(kmers) == 0 for kmers in kmer_sets):
+        return alignment_distance_matrix(_records)
+    return kmer_distance_matrix(kmer_sets)
+
+@st.fragment
 def construct_tree_from_fasta():
+    from Bio import Phylo, SeqIO
+    from Bio.Phylo.TreeConstruction import DistanceMatrix, DistanceTreeConstructor
+    from streamlit_lottie import st_lottie
     st.write("## 📂 Upload FASTA File")
     lottie = load_lottie_url("https://assets6.lottiefiles.com/packages/lf20_usmfx6bp.json")
     if lottie:
         st_lottie(lottie, height=150)
 
     uploaded_file = st.file_uploader("Choose a FASTA file (.fasta or .fa)", type=["fasta", "fa"])
+    method = st.selectbox("Distance method", DISTANCE_METHODS)
     if uploaded_file:
-        fasta_data = uploaded_file.read().decode("utf-8")
-        st.text_area("📄 FASTA File Content", fasta_data, height=200)
+        # Only the first 2 KB is echoed back; the full file stays in the upload buffer
+        preview = uploaded_file.read(2048).decode("utf-8", errors="replace")
+        st.text_area("📄 FASTA File Preview (first 2 KB)", preview, height=200)
+        download_button(uploaded_file.getvalue(), uploaded_file.name, "📥 Download Original FASTA")
+        uploaded_file.seek(0)
 
         try:
-            # Parse sequences
-            records = list(SeqIO.parse(StringIO(fasta_data), "fasta"))
+            # Parse sequences straight from the upload buffer
+            text = TextIOWrapper(uploaded_file, encoding="utf-8")
+            try:
+                records = list(SeqIO.parse(text, "fasta"))
+            finally:
+                # Detach so closing the wrapper doesn't close the upload
+                text.detach()
             if len(records) < 2:
                 st.warning("⚠️ Please upload a FASTA file with at least 2 sequences.")
                 return
 
-            # Compute pairwise distances using identity score
-            aligner = PairwiseAligner()
-            aligner.mode = 'global'
-
+            # Compute pairwise distances
             names = [rec.id for rec in records]
-            n = len(names)
-            matrix = [[0.0]*n for _ in range(n)]
-
-            for i in range(n):
-                for j in range(i):
-                    score = aligner.score(records[i].seq, records[j].seq)
-                    max_len = max(len(records[i]), len(records[j]))
-                    distance = 1 - (score / max_len)
-                    matrix[i][j] = matrix[j][i] = distance
+            fasta_digest = hashlib.sha1(uploaded_file.getbuffer()).hexdigest()
+            distances = fasta_distance_matrix(fasta_digest, method, records)
 
+            # DistanceMatrix expects the lower triangle, diagonal included
+            matrix = [distances[i, :i + 1].tolist() for i in range(len(names))]
             dm = DistanceMatrix(names, matrix)
             constructor = DistanceTreeConstructor()
             tree = constructor.nj(dm)
@@ -257,7 +466,9 @@ def construct_tree_from_fasta():
             st.write("### 🌿 Phylogenetic Tree (Biopython, Pairwise)")
             st.code(newick_tree)
             download_button(newick_tree, "phylo_from_fasta.newick", "📥 Download Tree (Newick Format)")
-            visualize_phylo_tree(newick_tree)
+            # The Newick text is only for display and download; the tree object is drawn directly
+            layout = st.radio("Tree layout", TREE_LAYOUTS, horizontal=True, key="fasta_layout")
+            visualize_phylo_tree(tree, layout)
 
         except Exception as e:
             st.error(f"❌ Error generating tree: {str(e)}")
@@ -265,7 +476,18 @@ def construct_tree_from_fasta():
 # -------------------------------
 # Simulate Divergence Page
 # -------------------------------
+SPECIES = ("Human", "Chimpanzee", "Gorilla", "Orangutan")
+
+# The topology and species are fixed, so only the mutation counts are filled in per simulation
+_SIM_NEWICK_TEMPLATE = "(({}:{{}},{}:{{}}):0.2,({}:{{}},{}:{{}}):0.3);".format(*SPECIES)
+
+@st.cache_data(show_spinner=False)
+def _sim_newick(mutations):
+    return _SIM_NEWICK_TEMPLATE.format(*mutations)
+
+@st.fragment
 def simulate_evolutionary_divergence():
+    from streamlit_lottie import st_lottie
     st.write("## 🧬 Simulate Evolutionary Divergence")
 
     # Load and show animated header
@@ -273,10 +495,17 @@ def simulate_evolutionary_divergence():
     if lottie:
         st_lottie(lottie, height=200)
 
-    species = ["Human", "Chimpanzee", "Gorilla", "Orangutan"]
-    mutations = random.sample(range(10, 100), 4)
+    # The simulation only changes when the user asks for it, not on every rerun
+    if 'sim_seed' not in st.session_state:
+        st.session_state.sim_seed = 0
+    if st.button("🎲 Resimulate"):
+        st.session_state.sim_seed += 1
+    rng = np.random.default_rng(st.session_state.sim_seed)
+
+    mutations = rng.choice(range(10, 100), len(SPECIES), replace=False).tolist()
 
-    newick_str = f"(({species[0]}:{mutations[0]},{species[1]}:{mutations[1]}):0.2,({species[2]}:{mutations[2]},{species[3]}:{mutations[3]}):0.3);"
+    # The parsed tree and its layout are cached on this string in turn
+    newick_str = _sim_newick(tuple(mutations))
 
     st.markdown("""
     <div style='background-color: #f0f8ff; padding: 20px; border-radius: 10px;'>
@@ -291,28 +520,32 @@ def simulate_evolutionary_divergence():
     st.markdown("### 🔢 Mutation Distances per Species")
     col1, col2, col3, col4 = st.columns(4)
     for i, col in enumerate([col1, col2, col3, col4]):
-        col.metric(label=species[i], value=f"{mutations[i]}")
+        col.metric(label=SPECIES[i], value=f"{mutations[i]}")
 
     # Visualize tree
-    visualize_phylo_tree(newick_str)
+    layout = st.radio("Tree layout", TREE_LAYOUTS, horizontal=True, key="sim_layout")
+    visualize_phylo_tree(newick_str, layout)
 
     # Show animated divider
     divider_lottie = load_lottie_url("https://assets1.lottiefiles.com/packages/lf20_j1adxtyb.json")
     if divider_lottie:
         st_lottie(divider_lottie, height=100)
 
-    # Visualizations
-    plot_mutation_bar_chart(species, mutations)
-    plot_heatmap(species, mutations)
-    plot_pie_chart(species, mutations)
+    # Visualizations, all drawn from one cached table
+    df = _mutation_df(SPECIES, tuple(mutations))
+    plot_mutation_bar_chart(df)
+    plot_heatmap(df)
+    plot_pie_chart(df)
 
     # Insight
-    generate_ai_insight(species, mutations)
+    generate_ai_insight(SPECIES, mutations)
 
 # -------------------------------
 # Evolution Stats Page
 # -------------------------------
+@st.fragment
 def show_evolution_stats():
+    from streamlit_lottie import st_lottie
     st.write("## 📈 Evolutionary Statistics")
     lottie = load_lottie_url("https://assets6.lottiefiles.com/packages/lf20_urbk83vw.json")
     if lottie:
@@ -329,40 +562,67 @@ def show_evolution_stats():
     for k, v in stats.items():
         st.markdown(f"**{k}:** {v}")
 
+# -------------------------------
+# Mutation Table
+# -------------------------------
+# Built once per simulation and shared by the three charts below
+@st.cache_data(show_spinner=False)
+def _mutation_df(species, mutations):
+    import pandas as pd
+    return pd.DataFrame({'Species': list(species), 'Mutations': list(mutations)})
+
 # -------------------------------
 # Bar Chart for Mutation Rates
 # -------------------------------
-def plot_mutation_bar_chart(species, mutations):
-    st.write("### 📊 Mutation Rates Bar Chart")
-    df = pd.DataFrame({'Species': species, 'Mutations': mutations})
+# Figures are cached on the mutation table; reruns only re-send them.
+# Colours are set explicitly, so Streamlit's theme is skipped (theme=None).
+@st.cache_data(show_spinner=False)
+def _bar_fig(df):
+    import plotly.express as px
     fig = px.bar(df, x='Species', y='Mutations', color='Species', title='Genetic Divergence Simulation', height=400)
-    st.plotly_chart(fig)
+    # Keep zoom/pan across reruns instead of relaying out the chart
+    fig.update_layout(uirevision='static')
+    return fig
+
+def plot_mutation_bar_chart(df):
+    st.write("### 📊 Mutation Rates Bar Chart")
+    st.plotly_chart(_bar_fig(df), theme=None, use_container_width=True)
 
 # -------------------------------
 # Heatmap of Divergence Scores
 # -------------------------------
-def plot_heatmap(species, mutations):
+@st.cache_data(show_spinner=False)
+def _heatmap_fig(df):
+    import plotly.express as px
+    fig = px.imshow(df['Mutations'].to_numpy()[np.newaxis, :], x=df['Species'].tolist(), color_continuous_scale='RdBu_r', text_auto=True)
+    fig.update_yaxes(showticklabels=False)
+    fig.update_layout(uirevision='static')
+    return fig
+
+def plot_heatmap(df):
     st.write("### 🔥 Heatmap of Divergence Scores")
-    df = pd.DataFrame([mutations], columns=species)
-    fig, ax = plt.subplots()
-    sns.heatmap(df, annot=True, cmap="coolwarm", cbar=True)
-    st.pyplot(fig)
+    st.plotly_chart(_heatmap_fig(df), theme=None, use_container_width=True)
 
 # -------------------------------
 # Pie Chart of Contributions
 # -------------------------------
-def plot_pie_chart(species, mutations):
-    st.write("### 🧬 Mutation Contribution by Species")
-    df = pd.DataFrame({'Species': species, 'Mutations': mutations})
+@st.cache_data(show_spinner=False)
+def _pie_fig(df):
+    import plotly.express as px
     fig = px.pie(df, values='Mutations', names='Species', title='Relative Divergence', hole=0.3)
-    st.plotly_chart(fig)
+    fig.update_layout(uirevision='static')
+    return fig
+
+def plot_pie_chart(df):
+    st.write("### 🧬 Mutation Contribution by Species")
+    st.plotly_chart(_pie_fig(df), theme=None, use_container_width=True)
 
 # -------------------------------
 # AI-like Summary
 # -------------------------------
 def generate_ai_insight(species, mutations):
-    max_idx = mutations.index(max(mutations))
-    min_idx = mutations.index(min(mutations))
+    max_idx = int(np.argmax(mutations))
+    min_idx = int(np.argmin(mutations))
     st.write("### 🧠 Evolution Insight")
     st.markdown(f"""
     - The most genetically divergent species is **{species[max_idx]}**
@@ -373,53 +633,56 @@ def generate_ai_insight(species, mutations):
 # -----------------
 # Acknowledgements 
 # -----------------
+_ACK_HTML = """
+<style>
+.ack-box {
+    background-color: #f9fcff;
+    padding: 25px;
+    border-radius: 12px;
+    border-left: 6px solid #2980b9;
+    box-shadow: 0 0 8px rgba(0, 0, 0, 0.05);
+    color: #2c3e50;
+}
+.ack-box h3 {
+    margin-top: 20px;
+    color: #2c3e50;
+}
+.ack-box ul {
+    padding-left: 20px;
+    margin-top: 10px;
+}
+.ack-box li {
+    margin-bottom: 5px;
+}
+</style>
+
+<div class="ack-box">
+    <h3>📚 Academic Guidance</h3>
+    <ul>
+        <li><strong>Dr. Kushagra Kashyap</strong> — For providing mentorship, continuous encouragement, and research direction.</li>
+        <li><strong>DES Pune University</strong> — For nurturing a culture of innovation and providing an ideal research environment.</li>
+    </ul>
+
+    <h3>🧠 Project Contributions</h3>
+    <p>This project was developed as part of a bioinformatics initiative, integrating knowledge from molecular biology, computational genomics, and data visualization.</p>
+
+    <h3>💻 Technical Foundation</h3>
+    <ul>
+        <li><strong>Python, Streamlit</strong> — For rapid app development</li>
+        <li><strong>BioPython</strong> — For sequence parsing, alignment and phylogenetics</li>
+        <li><strong>Plotly, Pyvis</strong> — For building interactive and meaningful data visualizations</li>
+    </ul>
+
+    <h3>💖 Personal Note</h3>
+    <p>Special thanks to my family and peers who supported me during this journey. This work reflects the collective effort, shared learning, and the spirit of open science.</p>
+</div>
+"""
+
+@st.fragment
 def show_acknowledgement():
     st.title("🙏 Acknowledgements")
 
-    st.markdown("""
-    <style>
-    .ack-box {
-        background-color: #f9fcff;
-        padding: 25px;
-        border-radius: 12px;
-        border-left: 6px solid #2980b9;
-        box-shadow: 0 0 8px rgba(0, 0, 0, 0.05);
-        color: #2c3e50;
-    }
-    .ack-box h3 {
-        margin-top: 20px;
-        color: #2c3e50;
-    }
-    .ack-box ul {
-        padding-left: 20px;
-        margin-top: 10px;
-    }
-    .ack-box li {
-        margin-bottom: 5px;
-    }
-    </style>
-
-    <div class="ack-box">
-        <h3>📚 Academic Guidance</h3>
-        <ul>
-            <li><strong>Dr. Kushagra Kashyap</strong> — For providing mentorship, continuous encouragement, and research direction.</li>
-            <li><strong>DES Pune University</strong> — For nurturing a culture of innovation and providing an ideal research environment.</li>
-        </ul>
-
-        <h3>🧠 Project Contributions</h3>
-        <p>This project was developed as part of a bioinformatics initiative, integrating knowledge from molecular biology, computational genomics, and data visualization.</p>
-
-        <h3>💻 Technical Foundation</h3>
-        <ul>
-            <li><strong>Python, Streamlit</strong> — For rapid app development</li>
-            <li><strong>BioPython</strong> — For sequence parsing, alignment and phylogenetics</li>
-            <li><strong>Plotly, Pyvis</strong> — For building interactive and meaningful data visualizations</li>
-        </ul>
-
-        <h3>💖 Personal Note</h3>
-        <p>Special thanks to my family and peers who supported me during this journey. This work reflects the collective effort, shared learning, and the spirit of open science.</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_ACK_HTML, unsafe_allow_html=True)
 
 # -------------------------------
 # Main App Runner
@@ -443,6 +706,7 @@ def run_phylo_app():
     """, unsafe_allow_html=True)
 
     tabs = st.tabs(["🏠 Home", "📂 Upload FASTA", "🧬 Simulate Divergence", "📊 Evolution Stats", "🙏 Acknowledgement"])
+    # Each page is an st.fragment, so interacting with a widget reruns only that page
     with tabs[0]: show_home()
     with tabs[1]: construct_tree_from_fasta()
     with tabs[2]: simulate_evolutionary_divergence()
@@ -0,0 +1,115 @@
+import numpy as np
+
+# Kept out of code.py: Streamlit re-executes the app script on every rerun,
+# so the JIT-compiled kernels live in a module that is imported once per process.
+
+# Numba is optional: without it the kernels run as plain Python
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+@njit(cache=True)
+def _is_newick_delimiter(c):
+    # ( ) , : ; [
+    return c == 40 or c == 41 or c == 44 or c == 58 or c == 59 or c == 91
+
+@njit(cache=True)
+def decode_newick(s):
+    # Single pass over the Newick bytes. Nodes are numbered in preorder (root = 0);
+    # returns the parent and depth of every node plus the byte spans of its label and branch length.
+    max_nodes = 1
+    for c in s:
+        if c == 40 or c == 44:
+            max_nodes += 1
+    parents = np.full(max_nodes, -1, dtype=np.int64)
+    node_depth = np.zeros(max_nodes, dtype=np.int64)
+    label_span = np.zeros((max_nodes, 2), dtype=np.int64)
+    length_span = np.zeros((max_nodes, 2), dtype=np.int64)
+    num_nodes = 1
+    current = 0
+    n = len(s)
+    i = 0
+    while i < n:
+        c = s[i]
+        if c == 40 or c == 44:
+            # '(' opens the first child of the current node, ',' starts a sibling
+            parent = current if c == 40 else parents[current]
+            if parent < 0:
+                raise ValueError("Malformed Newick string: unbalanced parentheses")
+            parents[num_nodes] = parent
+            node_depth[num_nodes] = node_depth[parent] + 1
+            current = num_nodes
+            num_nodes += 1
+            i += 1
+        elif c == 41:
+            current = parents[current]
+            if current < 0:
+                raise ValueError("Malformed Newick string: unbalanced parentheses")
+            i += 1
+        elif c == 59:
+            break
+        elif c == 58:
+            # Branch length runs up to the next delimiter
+            i += 1
+            length_span[current, 0] = i
+            while i < n and not _is_newick_delimiter(s[i]):
+                i += 1
+            length_span[current, 1] = i
+        elif c == 91:
+            # [comment]
+            while i < n and s[i] != 93:
+                i += 1
+            i += 1
+        elif c == 32 or c == 9 or c == 10 or c == 13:
+            i += 1
+        elif c == 39:
+            # 'quoted label'
+            start = i + 1
+            i = start
+            while i < n and s[i] != 39:
+                i += 1
+            label_span[current, 0] = start
+            label_span[current, 1] = i
+            i += 1
+        else:
+            start = i
+            while i < n and not _is_newick_delimiter(s[i]):
+                i += 1
+            end = i
+            while end > start and (s[end - 1] == 32 or s[end - 1] == 9 or s[end - 1] == 10 or s[end - 1] == 13):
+                end -= 1
+            label_span[current, 0] = start
+            label_span[current, 1] = end
+    return num_nodes, parents[:num_nodes], node_depth[:num_nodes], label_span[:num_nodes], length_span[:num_nodes]
+
+@njit(cache=True)
+def _identity_row(encoded, identity, i):
+    # Fills cells (i, j) and (j, i) for j <= i
+    length = encoded.shape[1]
+    for j in range(i + 1):
+        count = 0
+        for k in range(length):
+            if encoded[i, k] == encoded[j, k]:
+                count += 1
+        identity[i, j] = count / length
+        identity[j, i] = count / length
+
+@njit(parallel=True, cache=True)
+def pairwise_identity(encoded):
+    # Fraction of matching positions for every pair of equal-length sequences.
+    # Row i of the lower triangle has i + 1 cells, so each task pairs a short row with a long one
+    # (t and n - 1 - t) to give every thread the same amount of work.
+    n = encoded.shape[0]
+    identity = np.zeros((n, n))
+    for t in prange((n + 1) // 2):
+        _identity_row(encoded, identity, t)
+        if n - 1 - t != t:
+            _identity_row(encoded, identity, n - 1 - t)
+    return identity